@@ -54,6 +54,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # compress responses (JSON lists compress well); kept above middleware
+    # that reads or writes the response body
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -96,6 +99,23 @@ DATABASES = {
     }  # should first import env before using os.environ.get()
 }
 
+# Reuse database connections instead of reconnecting on every request.
+# psycopg 3 gets a connection pool (Django requires CONN_MAX_AGE=0 with it),
+# images still on psycopg2 fall back to persistent connections.
+try:
+    import psycopg_pool  # noqa: F401
+except ImportError:
+    DATABASES["default"]["CONN_MAX_AGE"] = 600
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+else:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 4)),
+            "timeout": 10,
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -137,6 +157,11 @@ MEDIA_URL = '/static/media/'
 MEDIA_ROOT = "/vol/web/media"
 STATIC_ROOT = "/vol/web/static"
 
+# Keep uploads up to the proxy's client_max_body_size (10M) in memory, so an
+# image is written to MEDIA_ROOT in a single write instead of being streamed
+# to a temporary file chunk by chunk first.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -144,6 +169,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "core.User"
 
+# Seconds to cache each user's recipe list responses, 0 disables it.
+# Writes through the API invalidate the cache, but the default cache is
+# per process, so only enable it with a shared cache (e.g. Redis or
+# memcached) in CACHES when running several workers.
+RECIPE_LIST_CACHE_TIMEOUT = int(os.environ.get("RECIPE_LIST_CACHE_TIMEOUT", 0))
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
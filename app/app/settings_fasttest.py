@@ -0,0 +1,15 @@
+"""
+Django settings for a quick local test run against in-memory SQLite.
+
+The models only use portable ORM features, so the suite runs unchanged.
+CI keeps testing against PostgreSQL through app.settings_test.
+"""
+
+from app.settings_test import *  # noqa: F401, F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
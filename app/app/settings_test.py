@@ -0,0 +1,12 @@
+"""
+Django settings for running the test suite.
+
+Used automatically by `python manage.py test`.
+"""
+
+from app.settings import *  # noqa: F401, F403
+
+# tests create many users; the default PBKDF2 hasher is slow by design
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
@@ -1,26 +1,83 @@
+import os
+import random
 import time
 
-from psycopg2 import OperationalError as Psycopg2OpError
+try:
+    from psycopg import OperationalError as PsycopgOpError
+except ImportError:  # images still on psycopg2
+    from psycopg2 import OperationalError as PsycopgOpError
 
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 
 
 class Command(BaseCommand):
     """Django command to wait for database."""
 
+    # exponential backoff with jitter between probes (in seconds)
+    min_delay = 0.05
+    backoff_rate = 2.0
+    # libpq's connect_timeout for a probe (it treats anything below 2 as 2)
+    connect_timeout = 2
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full-check',
+            action='store_true',
+            help='Also run the system checks against the database.',
+        )
+
+    def probe(self, connection):
+        """Open a connection and run SELECT 1 on it"""
+        if connection.vendor != 'postgresql':
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return
+
+        # connect with the driver directly: going through Django would take
+        # the connection from the pool, whose getconn() blocks for the pool
+        # timeout instead of failing fast
+        params = connection.get_connection_params()
+        params.setdefault('connect_timeout', self.connect_timeout)
+        conn = connection.Database.connect(**params)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            conn.close()
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
+        max_delay = float(os.environ.get("DB_WAIT_MAX_S", 5.0))
+        timeout = float(os.environ.get("DB_WAIT_TIMEOUT_S", 60.0))
+        deadline = time.monotonic() + timeout
+
         self.stdout.write('Waiting for database...')
+        attempt = 0
         db_up = False
         while db_up is False:
             try:
-                self.check(databases=['default'])
-                connections['default']  # make sure the connection is available
+                self.probe(connections['default'])
+                if options['full_check']:
+                    self.check(databases=['default'])
                 db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+            except (PsycopgOpError, OperationalError):
+                if time.monotonic() >= deadline:
+                    raise CommandError(
+                        f'Database unavailable after {timeout:g} seconds'
+                    )
+                backoff = self.min_delay * self.backoff_rate ** attempt
+                delay = random.uniform(
+                    self.min_delay,
+                    max(self.min_delay, min(max_delay, backoff))
+                )
+                self.stdout.write(
+                    f'Database unavailable, waiting {delay:.2f} seconds...'
+                )
+                time.sleep(delay)
+                if backoff < max_delay:  # keeps the exponent bounded
+                    attempt += 1
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
@@ -63,6 +63,15 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    class Meta:
+        # recipes are listed per user, newest first
+        indexes = [
+            models.Index(
+                fields=["user", "-id"],
+                name="recipe_user_id_desc_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -75,6 +84,15 @@ class Tag(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        # tags and ingredients are listed per user, ordered by name
+        indexes = [
+            models.Index(
+                fields=["user", "-name"],
+                name="tag_user_name_desc_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -86,5 +104,14 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        # tags and ingredients are listed per user, ordered by name
+        indexes = [
+            models.Index(
+                fields=["user", "-name"],
+                name="ingredient_user_name_desc_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -1,27 +1,84 @@
 from unittest.mock import patch
-from psycopg2 import OperationalError as Psycopg2OperationalError
+try:
+    from psycopg import OperationalError as PsycopgOperationalError
+except ImportError:
+    from psycopg2 import OperationalError as PsycopgOperationalError
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 
 
-@patch("core.management.commands.wait_for_db.Command.check")
+@patch("core.management.commands.wait_for_db.connections")
 class CommandTests(SimpleTestCase):
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_connections):
         """Test waiting for db when db is available"""
 
-        patched_check.return_value = True
+        connection = patched_connections["default"]
         call_command('wait_for_db')
+        connection.ensure_connection.assert_called_once_with()
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with('SELECT 1')
+
+    def test_wait_for_db_postgres_skips_pool(self, patched_connections):
+        """Test postgres is probed with a direct, short-timeout connection"""
+
+        connection = patched_connections["default"]
+        connection.vendor = 'postgresql'
+        connection.get_connection_params.return_value = {'dbname': 'app'}
+        call_command('wait_for_db')
+        connection.ensure_connection.assert_not_called()
+        connection.Database.connect.assert_called_once_with(
+            dbname='app', connect_timeout=2
+        )
+        conn = connection.Database.connect.return_value
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with('SELECT 1')
+        conn.close.assert_called_once_with()
+
+    @patch("core.management.commands.wait_for_db.Command.check")
+    def test_wait_for_db_full_check(self, patched_check, patched_connections):
+        """Test the system checks only run when asked for"""
+
+        call_command('wait_for_db')
+        patched_check.assert_not_called()
+
+        call_command('wait_for_db', '--full-check')
         patched_check.assert_called_once_with(databases=['default'])
 
-    @patch('time.sleep')
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    @patch('core.management.commands.wait_for_db.time')
+    def test_wait_for_db_delay(self, patched_time, patched_connections):
         """Test waiting for db"""
 
-        patched_check.side_effect = [Psycopg2OperationalError] * 3 + \
-            [OperationalError] * 2 + [True]
+        patched_time.monotonic.return_value = 0
+        patched_connect = patched_connections["default"].ensure_connection
+        patched_connect.side_effect = [PsycopgOperationalError] * 3 + \
+            [OperationalError] * 2 + [None]
+        call_command('wait_for_db')
+        self.assertEqual(patched_connect.call_count, 6)
+        self.assertEqual(patched_time.sleep.call_count, 5)
+
+    @patch('core.management.commands.wait_for_db.time')
+    def test_wait_for_db_delay_capped(self, patched_time, patched_connections):
+        """Test the delay stays capped however many probes fail"""
+
+        patched_time.monotonic.return_value = 0
+        patched_connect = patched_connections["default"].ensure_connection
+        patched_connect.side_effect = [OperationalError] * 2000 + [None]
         call_command('wait_for_db')
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        delays = [c.args[0] for c in patched_time.sleep.call_args_list]
+        self.assertEqual(len(delays), 2000)
+        self.assertLessEqual(max(delays), 5.0)
+
+    @patch('core.management.commands.wait_for_db.time')
+    def test_wait_for_db_timeout(self, patched_time, patched_connections):
+        """Test waiting for db gives up once the timeout is exceeded"""
+
+        patched_connect = patched_connections["default"].ensure_connection
+        patched_time.monotonic.side_effect = [0, 0, 30, 61]
+        patched_connect.side_effect = OperationalError
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db')
+        self.assertEqual(patched_connect.call_count, 3)
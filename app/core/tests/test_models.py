@@ -3,6 +3,7 @@ from unittest.mock import patch
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
 
 from core import models
 
@@ -35,8 +36,12 @@ class ModelTests(TestCase):
         ]
 
         for email, expected in sample_emails:
-            user = get_user_model().objects.create_user(email, "test123")
-            self.assertEqual(user.email, expected)
+            self.assertEqual(BaseUserManager.normalize_email(email), expected)
+
+        # one end-to-end check that create_user applies the normalization
+        email, expected = sample_emails[0]
+        user = get_user_model().objects.create_user(email, "test123")
+        self.assertEqual(user.email, expected)
 
     def test_new_user_without_email_raise_error(self):
         """Test creating user without email raises error"""
@@ -63,7 +68,7 @@ class ModelTests(TestCase):
             user=user,
             title="Steak and mushroom sauce",
             time_minutes=5,
-            price=Decimal(5.00),
+            price=Decimal("5.00"),
             description="This is a test description"
         )
 
@@ -1,3 +1,5 @@
+import copy
+
 from rest_framework import serializers
 
 from core.models import (
@@ -7,7 +9,22 @@ from core.models import (
 )
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    # ModelSerializer introspects the model every time a serializer is
+    # instantiated. The fields only depend on the class, so build them once
+    # per class and hand each instance its own deep copy to bind.
+    # (a comment rather than a docstring, so it does not leak into the
+    # OpenAPI descriptions of serializers that have no docstring)
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        if cls not in self._fields_cache:
+            self._fields_cache[cls] = super().get_fields()
+        return copy.deepcopy(self._fields_cache[cls])
+
+
+class IngredientSerializer(CachedFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Ingredient
@@ -18,7 +35,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ["id",]
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Tag objects"""
 
     class Meta:
@@ -30,7 +47,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id",]
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipe objects"""
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
@@ -50,21 +67,25 @@ class RecipeSerializer(serializers.ModelSerializer):
 
     def _get_or_create_tags(self, tags, recipe):
         auth_user = self.context["request"].user
+        tag_objs = []
         for tag in tags:
             tag_obj, created = Tag.objects.get_or_create(
                 user=auth_user,
                 **tag
             )
-            recipe.tags.add(tag_obj)
+            tag_objs.append(tag_obj)
+        recipe.tags.add(*tag_objs)  # one INSERT for all the links
 
     def _get_or_create_ingredients(self, ingredients, recipe):
         auth_user = self.context["request"].user
+        ingredient_objs = []
         for ingredient in ingredients:
             ingredient_obj, _ = Ingredient.objects.get_or_create(
                 user=auth_user,
                 **ingredient
             )
-            recipe.ingredients.add(ingredient_obj)
+            ingredient_objs.append(ingredient_obj)
+        recipe.ingredients.add(*ingredient_objs)
 
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
@@ -91,13 +112,43 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class RecipeListSerializer(serializers.BaseSerializer):
+    """Read-only serializer for listing recipes
+
+    Produces the same output as RecipeSerializer, but builds each row as a
+    plain dict from the (prefetched) instance instead of going through a
+    DRF field per attribute.
+    """
+    price_field = serializers.DecimalField(
+        max_digits=Recipe._meta.get_field("price").max_digits,
+        decimal_places=Recipe._meta.get_field("price").decimal_places,
+    )
+
+    def to_representation(self, instance):
+        return {
+            "id": instance.id,
+            "title": instance.title,
+            "time_minutes": instance.time_minutes,
+            "price": self.price_field.to_representation(instance.price),
+            "link": instance.link,
+            "tags": [
+                {"id": tag.id, "name": tag.name}
+                for tag in instance.tags.all()
+            ],
+            "ingredients": [
+                {"id": ingredient.id, "name": ingredient.name}
+                for ingredient in instance.ingredients.all()
+            ],
+        }
+
+
 class RecipeDetailSerializer(RecipeSerializer):
 
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ["description"] + ["image"]
 
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+class RecipeImageSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
 
     class Meta:
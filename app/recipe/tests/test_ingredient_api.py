@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -26,10 +26,26 @@ def create_user(email="user@example.com", password="testpass123"):
     return get_user_model().objects.create_user(email, password)
 
 
-class PublicIngredientApiTests(TestCase):
+def bulk_create_ingredients(user, names):
+    return Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names]
+    )
 
-    def setUp(self):
-        self.client = APIClient()
+
+def bulk_create_recipes(user, titles):
+    return Recipe.objects.bulk_create([
+        Recipe(
+            user=user,
+            title=title,
+            time_minutes=5,
+            price=Decimal("5.00"),
+        )
+        for title in titles
+    ])
+
+
+class PublicIngredientApiTests(SimpleTestCase):
+    client_class = APIClient
 
     def test_auth_required(self):
         res = self.client.get(INGREDIENT_URL)
@@ -37,17 +53,20 @@ class PublicIngredientApiTests(TestCase):
 
 
 class PrivateIngredientApiTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
 
     def setUp(self):
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_ingredients(self):
-        Ingredient.objects.create(user=self.user, name="Kale")
-        Ingredient.objects.create(user=self.user, name="Salt")
+        bulk_create_ingredients(self.user, ["Kale", "Salt"])
 
-        res = self.client.get(INGREDIENT_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENT_URL)
 
         ingredients = Ingredient.objects.all().order_by("-name")
         serializer = IngredientSerializer(ingredients, many=True)
@@ -100,17 +119,17 @@ class PrivateIngredientApiTests(TestCase):
         self.assertFalse(ingredients.exists())
 
     def test_filter_ingredients_assigned_to_recipes(self):
-        in1 = Ingredient.objects.create(user=self.user, name="Apple")
-        in2 = Ingredient.objects.create(user=self.user, name="Turkey")
+        in1, in2 = bulk_create_ingredients(self.user, ["Apple", "Turkey"])
         recipe = Recipe.objects.create(
             user=self.user,
             title="Apple pie",
             time_minutes=5,
-            price=Decimal(5.00)
+            price=Decimal("5.00")
         )
         recipe.ingredients.add(in1)
 
-        res = self.client.get(INGREDIENT_URL, {"assigned_only": 1})
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENT_URL, {"assigned_only": 1})
 
         s1 = IngredientSerializer(in1)
         s2 = IngredientSerializer(in2)
@@ -118,22 +137,12 @@ class PrivateIngredientApiTests(TestCase):
         self.assertNotIn(s2.data, res.data)
 
     def test_filter_ingredients_unique(self):
-        ing = Ingredient.objects.create(user=self.user, name="Egg")
-        Ingredient.objects.create(user=self.user, name="Cheese")
-        recipe1 = Recipe.objects.create(
-            user=self.user,
-            title="Omelette",
-            time_minutes=5,
-            price=Decimal(5.00)
-        )
-        recipe2 = Recipe.objects.create(
-            user=self.user,
-            title="Scrambled eggs",
-            time_minutes=5,
-            price=Decimal(5.00)
+        ing, _ = bulk_create_ingredients(self.user, ["Egg", "Cheese"])
+        recipes = bulk_create_recipes(
+            self.user,
+            ["Omelette", "Scrambled eggs"]
         )
-        recipe1.ingredients.add(ing)
-        recipe2.ingredients.add(ing)
+        ing.recipe_set.add(*recipes)
 
         res = self.client.get(INGREDIENT_URL, {"assigned_only": 1})
 
@@ -1,10 +1,13 @@
 from decimal import Decimal
-import tempfile
+import functools
+from io import BytesIO
 import os
 from PIL import Image
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -22,18 +25,20 @@ from recipe.serializers import (
 )
 
 
-RECIPES_URL = "recipe:recipe-list"
+RECIPES_URL = reverse("recipe:recipe-list")
 
 
+@functools.lru_cache(maxsize=None)
 def detail_url(recipe_id):
     return reverse("recipe:recipe-detail", args=[recipe_id])
 
 
+@functools.lru_cache(maxsize=None)
 def image_upload_url(recipe_id):
     return reverse("recipe:recipe-upload-image", args=[recipe_id])
 
 
-def create_recipe(user, **params):
+def recipe_defaults(**params):
     defaults = {
         "title": "Sample Recipe",
         "time_minutes": 10,
@@ -42,43 +47,72 @@ def create_recipe(user, **params):
         "link": "https://example.com/recipe.pdf",
     }
     defaults.update(params)
+    return defaults
+
 
-    recipe = Recipe.objects.create(user=user, **defaults)
+def create_recipe(user, **params):
+    recipe = Recipe.objects.create(user=user, **recipe_defaults(**params))
     return recipe
 
 
+def bulk_create_recipes(user, titles, **params):
+    return Recipe.objects.bulk_create([
+        Recipe(user=user, **recipe_defaults(title=title, **params))
+        for title in titles
+    ])
+
+
 def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicRecipeApiTests(TestCase):
+def bulk_create_tags(user, names):
+    return Tag.objects.bulk_create(
+        [Tag(user=user, name=name) for name in names]
+    )
+
+
+def bulk_create_ingredients(user, names):
+    return Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names]
+    )
+
+
+class PublicRecipeApiTests(SimpleTestCase):
     """Test unauthenticated recipe API access"""
 
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         """Test that authentication is required"""
-        res = self.client.get(reverse(RECIPES_URL))
+        res = self.client.get(RECIPES_URL)
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
 class PrivateRecipeApiTests(TestCase):
+    client_class = APIClient
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email="test@example.com",
             password="testpass123"
         )
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
-        create_recipe(self.user)
-        create_recipe(self.user)
+        recipes = bulk_create_recipes(self.user, ["Sample Recipe"] * 2)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        tag.recipe_set.add(*recipes)
+        ingredient.recipe_set.add(*recipes)
 
-        res = self.client.get(reverse(RECIPES_URL))
+        # recipes, tags and ingredients, independent of the number of recipes
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.all().order_by("-id")
         serializer = RecipeSerializer(recipes, many=True)
@@ -86,6 +120,15 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_retrieve_recipes_compressed(self):
+        bulk_create_recipes(self.user, ["Sample Recipe"] * 5)
+
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res.headers["Vary"])
+
     def test_recipe_list_limited_to_user(self):
         other_user = create_user(
             email="other@example.com",
@@ -94,19 +137,26 @@ class PrivateRecipeApiTests(TestCase):
         create_recipe(other_user)
         create_recipe(self.user)
 
-        res = self.client.get(reverse(RECIPES_URL))
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.filter(user=self.user)
-        serializer = RecipeSerializer(recipes, many=True)
+        # the payload shape is covered by test_retrieve_recipes
+        expected_ids = list(
+            Recipe.objects.filter(user=self.user)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual([r["id"] for r in res.data], expected_ids)
 
     def test_get_recipe_detail(self):
         recipe = create_recipe(self.user)
 
         url = detail_url(recipe.id)
-        res = self.client.get(url)
+        # recipe, tags and ingredients; catches relations loaded lazily
+        with self.assertNumQueries(3):
+            res = self.client.get(url)
 
         serializer = RecipeDetailSerializer(recipe)
         self.assertEqual(res.data, serializer.data)
@@ -118,7 +168,7 @@ class PrivateRecipeApiTests(TestCase):
             "price": Decimal("10.00"),
         }
 
-        res = self.client.post(reverse(RECIPES_URL), payload)
+        res = self.client.post(RECIPES_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         recipe = Recipe.objects.get(id=res.data["id"])
@@ -216,7 +266,7 @@ class PrivateRecipeApiTests(TestCase):
                 {"name": "Curry"},
             ]
         }
-        res = self.client.post(reverse(RECIPES_URL), payload, format="json")
+        res = self.client.post(RECIPES_URL, payload, format="json")
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         recipes = Recipe.objects.filter(user=self.user)
@@ -224,12 +274,11 @@ class PrivateRecipeApiTests(TestCase):
 
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
-        for tag in payload["tags"]:
-            exists = recipe.tags.filter(
-                name=tag["name"],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        expected_names = {tag["name"] for tag in payload["tags"]}
+        actual_names = set(
+            recipe.tags.filter(user=self.user).values_list("name", flat=True)
+        )
+        self.assertEqual(actual_names, expected_names)
 
     def test_create_recipe_with_existing_tags(self):
         tag = Tag.objects.create(user=self.user, name="Indian")
@@ -243,7 +292,7 @@ class PrivateRecipeApiTests(TestCase):
             ]
         }
 
-        res = self.client.post(reverse(RECIPES_URL), payload, format="json")
+        res = self.client.post(RECIPES_URL, payload, format="json")
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         recipes = Recipe.objects.filter(user=self.user)
@@ -251,12 +300,11 @@ class PrivateRecipeApiTests(TestCase):
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
         self.assertIn(tag, recipe.tags.all())  # why
-        for tag in payload["tags"]:
-            exists = recipe.tags.filter(
-                name=tag["name"],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        expected_names = {tag["name"] for tag in payload["tags"]}
+        actual_names = set(
+            recipe.tags.filter(user=self.user).values_list("name", flat=True)
+        )
+        self.assertEqual(actual_names, expected_names)
 
     def test_create_tag_on_update(self):
         recipe = create_recipe(self.user)
@@ -315,19 +363,20 @@ class PrivateRecipeApiTests(TestCase):
                 {"name": "Soy Sauce"},
             ]
         }
-        res = self.client.post(reverse(RECIPES_URL), payload, format="json")
+        res = self.client.post(RECIPES_URL, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         recipes = Recipe.objects.filter(user=self.user)
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
-        for ingredient in payload["ingredients"]:
-            exists = recipe.ingredients.filter(
-                name=ingredient["name"],
+        expected_names = {i["name"] for i in payload["ingredients"]}
+        actual_names = set(
+            recipe.ingredients.filter(
                 user=self.user
-            ).exists()
-            self.assertTrue(exists)
+            ).values_list("name", flat=True)
+        )
+        self.assertEqual(actual_names, expected_names)
 
     def test_create_recipe_with_existing_ingredients(self):
         ingredient = Ingredient.objects.create(
@@ -343,7 +392,7 @@ class PrivateRecipeApiTests(TestCase):
                 {"name": "Soy Sauce"},
             ]
         }
-        res = self.client.post(reverse(RECIPES_URL), payload, format="json")
+        res = self.client.post(RECIPES_URL, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         recipes = Recipe.objects.filter(user=self.user)
@@ -351,12 +400,13 @@ class PrivateRecipeApiTests(TestCase):
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
         self.assertIn(ingredient, recipe.ingredients.all())
-        for ingredient in payload["ingredients"]:
-            exists = recipe.ingredients.filter(
-                name=ingredient["name"],
+        expected_names = {i["name"] for i in payload["ingredients"]}
+        actual_names = set(
+            recipe.ingredients.filter(
                 user=self.user
-            ).exists()
-            self.assertTrue(exists)
+            ).values_list("name", flat=True)
+        )
+        self.assertEqual(actual_names, expected_names)
 
     def test_create_ingredient_on_update(self):
         recipe = create_recipe(self.user)
@@ -409,22 +459,17 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(recipe.ingredients.count(), 0)
 
     def test_filter_by_tags(self):
-        r1 = create_recipe(
-            user=self.user,
-            title="Thai Vegetable Curry",
-        )
-        r2 = create_recipe(
+        r1, r2, r3 = bulk_create_recipes(
             self.user,
-            title="Aubergine with Tahini",
+            ["Thai Vegetable Curry", "Aubergine with Tahini", "Fish and Chips"]
         )
-        tag1 = Tag.objects.create(user=self.user, name="Vegan")
-        tag2 = Tag.objects.create(user=self.user, name="Vegetarian")
+        tag1, tag2 = bulk_create_tags(self.user, ["Vegan", "Vegetarian"])
         r1.tags.add(tag1)
         r2.tags.add(tag2)
-        r3 = create_recipe(self.user, title="Fish and Chips")
 
         params = {"tags": f"{tag1.id},{tag2.id}"}
-        res = self.client.get(reverse(RECIPES_URL), params)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL, params)
 
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
@@ -433,23 +478,50 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(s2.data, res.data)
         self.assertNotIn(s3.data, res.data)
 
+    def test_filter_by_tags_unique(self):
+        recipe = create_recipe(self.user)
+        tag1, tag2 = bulk_create_tags(self.user, ["Vegan", "Dinner"])
+        recipe.tags.add(tag1, tag2)
+
+        params = {"tags": f"{tag1.id},{tag2.id}"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual([r["id"] for r in res.data], [recipe.id])
+
+    def test_filter_by_tags_ignores_invalid_ids(self):
+        r1, r2 = bulk_create_recipes(self.user, ["Pho", "Ramen"])
+        tag = Tag.objects.create(user=self.user, name="Soup")
+        r1.tags.add(tag)
+
+        params = {"tags": f"{tag.id},{tag.id},abc,"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data], [r1.id])
+
+        res = self.client.get(RECIPES_URL, {"tags": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+        # superscript digits pass str.isdigit() but int() rejects them
+        res = self.client.get(RECIPES_URL, {"tags": f"{tag.id},\u00b2"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data], [r1.id])
+
     def test_filter_by_ingredients(self):
-        r1 = create_recipe(
-            user=self.user,
-            title="Egg Curry",
-        )
-        r2 = create_recipe(
+        r1, r2, r3 = bulk_create_recipes(
             self.user,
-            title="Paneer Butter Masala",
+            ["Egg Curry", "Paneer Butter Masala", "Chicken Biryani"]
         )
-        i1 = Ingredient.objects.create(user=self.user, name="Egg")
-        i2 = Ingredient.objects.create(user=self.user, name="Paneer")
+        i1, i2 = bulk_create_ingredients(self.user, ["Egg", "Paneer"])
         r1.ingredients.add(i1)
         r2.ingredients.add(i2)
-        r3 = create_recipe(self.user, title="Chicken Biryani")
 
         params = {"ingredients": f"{i1.id},{i2.id}"}
-        res = self.client.get(reverse(RECIPES_URL), params)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL, params)
 
         s1 = RecipeSerializer(r1)
         s2 = RecipeSerializer(r2)
@@ -459,27 +531,126 @@ class PrivateRecipeApiTests(TestCase):
         self.assertNotIn(s3.data, res.data)
 
 
-class ImageUploadTests(TestCase):
+@override_settings(RECIPE_LIST_CACHE_TIMEOUT=60)
+class RecipeListCacheTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
+            email="test@example.com",
+            password="testpass123"
+        )
 
     def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_list_cached(self):
+        create_recipe(self.user)
+        res = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(RECIPES_URL)
+
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, res.data)
+
+    def test_list_cached_per_filter(self):
+        r1, r2 = bulk_create_recipes(self.user, ["Pho", "Ramen"])
+        tag = Tag.objects.create(user=self.user, name="Soup")
+        r1.tags.add(tag)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(RECIPES_URL, {"tags": f"{tag.id}"})
+
+        self.assertEqual([r["id"] for r in res.data], [r1.id])
+
+    def test_create_recipe_invalidates_cache(self):
+        create_recipe(self.user)
+        self.client.get(RECIPES_URL)
+
+        payload = {
+            "title": "Chocolate Cheesecake",
+            "time_minutes": 30,
+            "price": Decimal("10.00"),
+        }
+        self.client.post(RECIPES_URL, payload)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_evicted_version_does_not_serve_stale_list(self):
+        create_recipe(self.user)
+        self.client.get(RECIPES_URL)
+        payload = {
+            "title": "Pho",
+            "time_minutes": 30,
+            "price": Decimal("10.00"),
+        }
+        self.client.post(RECIPES_URL, payload)
+
+        cache.delete(f"recipe-list-version:{self.user.pk}")
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data), 2)
+
+    @override_settings(RECIPE_LIST_CACHE_TIMEOUT=0)
+    def test_invalidate_skipped_when_cache_disabled(self):
+        payload = {
+            "title": "Pho",
+            "time_minutes": 30,
+            "price": Decimal("10.00"),
+        }
+        self.client.post(RECIPES_URL, payload)
+
+        self.assertIsNone(cache.get(f"recipe-list-version:{self.user.pk}"))
+
+    def test_update_tag_invalidates_cache(self):
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        recipe.tags.add(tag)
+        self.client.get(RECIPES_URL)
+
+        url = reverse("recipe:tag-detail", args=[tag.id])
+        self.client.patch(url, {"name": "Brunch"})
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data[0]["tags"][0]["name"], "Brunch")
+
+
+class ImageUploadTests(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email="user@example.com",
             password="password123"
         )
+        cls.recipe = create_recipe(cls.user)
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
-        self.recipe = create_recipe(self.user)
 
     def tearDown(self):
-        self.recipe.image.delete()
+        # rows are rolled back with the test, uploaded files are not
+        if self.recipe.image:
+            self.recipe.image.delete(save=False)
 
     def test_upload_image(self):
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as image_file:
-            img = Image.new("RGB", (10, 10))
-            img.save(image_file, format="JPEG")
-            image_file.seek(0)
-            payload = {"image": image_file}
+        image_file = BytesIO()
+        Image.new("RGB", (10, 10)).save(image_file, format="JPEG")
+        payload = {
+            "image": SimpleUploadedFile(
+                "image.jpg",
+                image_file.getvalue(),
+                content_type="image/jpeg"
+            )
+        }
+        # fetch the recipe and update its image column, nothing else
+        with self.assertNumQueries(2):
             res = self.client.post(url, payload, format="multipart")
 
         self.recipe.refresh_from_db()
@@ -2,7 +2,7 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -25,11 +25,28 @@ def create_user(email="user@example.com", password="testpass123"):
     return get_user_model().objects.create_user(email, password)
 
 
-class PublicTagsApiTests(TestCase):
+def bulk_create_tags(user, names):
+    return Tag.objects.bulk_create(
+        [Tag(user=user, name=name) for name in names]
+    )
+
+
+def bulk_create_recipes(user, titles):
+    return Recipe.objects.bulk_create([
+        Recipe(
+            user=user,
+            title=title,
+            time_minutes=5,
+            price=Decimal("5.00"),
+        )
+        for title in titles
+    ])
+
+
+class PublicTagsApiTests(SimpleTestCase):
     """Test the publicly available tags API"""
 
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         res = self.client.get(TAGS_URL)
@@ -39,16 +56,20 @@ class PublicTagsApiTests(TestCase):
 class PrivateTagsApiTests(TestCase):
     """Test the authorized user tags API"""
 
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
-        Tag.objects.create(user=self.user, name="Vegan")
-        Tag.objects.create(user=self.user, name="Dessert")
+        bulk_create_tags(self.user, ["Vegan", "Dessert"])
 
-        res = self.client.get(TAGS_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URL)
 
         tags = Tag.objects.all().order_by("-name")
         serializer = TagSerializer(tags, many=True)
@@ -94,13 +115,12 @@ class PrivateTagsApiTests(TestCase):
         self.assertFalse(tags.exists())
 
     def test_filter_tags_assigned_to_recipes(self):
-        tag1 = Tag.objects.create(user=self.user, name="Breakfast")
-        tag2 = Tag.objects.create(user=self.user, name="Lunch")
+        tag1, tag2 = bulk_create_tags(self.user, ["Breakfast", "Lunch"])
         recipe = Recipe.objects.create(
             user=self.user,
             title="Coriander eggs on toast",
             time_minutes=10,
-            price=Decimal(5.00),
+            price=Decimal("5.00"),
         )
         recipe.tags.add(tag1)
 
@@ -116,22 +136,9 @@ class PrivateTagsApiTests(TestCase):
         self.assertNotIn(serializer2.data, res.data)
 
     def test_filter_tags_assigned_unique(self):
-        tag = Tag.objects.create(user=self.user, name="Breakfast")
-        Tag.objects.create(user=self.user, name="Lunch")
-        recipe1 = Recipe.objects.create(
-            user=self.user,
-            title="Pancakes",
-            time_minutes=5,
-            price=Decimal(3.00),
-        )
-        recipe1.tags.add(tag)
-        recipe2 = Recipe.objects.create(
-            user=self.user,
-            title="Porridge",
-            time_minutes=3,
-            price=Decimal(2.00),
-        )
-        recipe2.tags.add(tag)
+        tag, _ = bulk_create_tags(self.user, ["Breakfast", "Lunch"])
+        recipes = bulk_create_recipes(self.user, ["Pancakes", "Porridge"])
+        tag.recipe_set.add(*recipes)
 
         res = self.client.get(
             TAGS_URL,
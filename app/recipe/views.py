@@ -1,3 +1,11 @@
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
 from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
@@ -11,9 +19,9 @@ from rest_framework import (
     )
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from core.authentication import CachedTokenAuthentication
 from core.models import (
     Recipe,
     Tag,
@@ -22,17 +30,65 @@ from core.models import (
 from recipe import serializers
 
 
-@extend_schema_view(
-    list=extend_schema(
-        parameters=[
-            OpenApiParameter(
-                "assigned_only",
-                OpenApiTypes.INT,
-                enum=[0, 1],
-                description="Filter tags by assigned only"
-            )
-        ]
+@functools.lru_cache(maxsize=1024)
+def _params_to_ints(qs):
+    """Convert a comma separated query string of ids to a set of ints"""
+    # duplicate ids are dropped and non-numeric ids are ignored; frozen since
+    # the cached result is shared between requests
+    return frozenset(
+        int(str_id) for str_id in qs.split(",")
+        if str_id.strip().isdecimal()
     )
+
+
+def _recipe_list_version_key(user):
+    return f"recipe-list-version:{user.pk}"
+
+
+def invalidate_recipe_list_cache(user):
+    """Drop the user's cached recipe lists"""
+    if not settings.RECIPE_LIST_CACHE_TIMEOUT:
+        return
+    # cache keys embed a per-user version, so a new version orphans every
+    # cached list of that user at once; orphans expire on their own
+    cache.set(_recipe_list_version_key(user), uuid.uuid4().hex, None)
+
+
+def _recipe_list_cache_key(user, tags, ingredients):
+    version_key = _recipe_list_version_key(user)
+    version = cache.get(version_key)
+    if version is None:
+        # an evicted version must not fall back to a fixed value, or lists
+        # cached under it before an earlier invalidation would be served
+        # again; add() keeps the version a concurrent request may have set
+        version = uuid.uuid4().hex
+        cache.add(version_key, version, None)
+        version = cache.get(version_key, version)
+    filters = hashlib.sha256(f"{tags}|{ingredients}".encode()).hexdigest()
+    return f"recipe-list:{user.pk}:{version}:{filters}"
+
+
+# query parameters documented on the list endpoints
+ASSIGNED_ONLY_PARAM = OpenApiParameter(
+    "assigned_only",
+    OpenApiTypes.INT,
+    enum=[0, 1],
+    description="Filter tags by assigned only"
+)
+TAGS_PARAM = OpenApiParameter(
+    name="tags",
+    type=OpenApiTypes.STR,
+    description="Comma separated list of tags ID to filter by"
+)
+INGREDIENTS_PARAM = OpenApiParameter(
+    name="ingredients",
+    type=OpenApiTypes.STR,
+    description="Comma separated list of ingredients ID to filter by"
+)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[ASSIGNED_ONLY_PARAM])
 )
 class BaseRecipeAttrViewSet(
         mixins.DestroyModelMixin,
@@ -40,46 +96,58 @@ class BaseRecipeAttrViewSet(
         mixins.ListModelMixin,
         viewsets.GenericViewSet
 ):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    recipe_field = None  # name of the Recipe field linking to the model
 
     def get_queryset(self):
         assigned_only = int(self.request.query_params.get("assigned_only", 0))
-        queryset = self.queryset.filter(
-            user=self.request.user
-        )
+        q = Q(user=self.request.user)
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return queryset.order_by("-name").distinct()
+            # EXISTS on the through table instead of joining through it, so
+            # items used by several recipes are not repeated
+            relation = Recipe._meta.get_field(self.recipe_field)
+            q &= Exists(relation.remote_field.through.objects.filter(
+                **{relation.m2m_reverse_field_name(): OuterRef("pk")}
+            ))
+        # only load the columns the serializer exposes
+        fields = self.get_serializer_class().Meta.fields
+        queryset = self.queryset.filter(q).only(*fields)
+        return queryset.order_by("-name")
+
+    def list(self, request, *args, **kwargs):
+        # the serializers only expose plain columns, so read them as dicts
+        # rather than building a model instance and a serializer per row
+        fields = self.get_serializer_class().Meta.fields
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(list(queryset.values(*fields)))
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # recipe lists show tag and ingredient names
+        invalidate_recipe_list_cache(self.request.user)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_recipe_list_cache(self.request.user)
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    recipe_field = "tags"
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     serializer_class = serializers.IngredientSerializer
     queryset = Ingredient.objects.all()
+    recipe_field = "ingredients"
 
 
 @extend_schema_view(
     list=extend_schema(
-        parameters=[
-            OpenApiParameter(
-                name="tags",
-                type=OpenApiTypes.STR,
-                description="Comma separated list of tags ID to filter by"
-            ),
-            OpenApiParameter(
-                name="ingredients",
-                type=OpenApiTypes.STR,
-                description=(
-                    "Comma separated list of"
-                    "ingredients ID to filter by"
-                )
-            )
-        ]
+        parameters=[TAGS_PARAM, INGREDIENTS_PARAM],
+        responses=serializers.RecipeSerializer(many=True),
     )
 )
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -87,35 +155,76 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
-    def _params_to_ints(self, qs):
-        return [int(str_id) for str_id in qs.split(",")]
-
     def get_queryset(self):
         tags = self.request.query_params.get("tags")
         ingredients = self.request.query_params.get("ingredients")
-        queryset = self.queryset.filter(
-            user=self.request.user
-        )
+        q = Q(user=self.request.user)
+        # EXISTS instead of joining the through tables, so a recipe matching
+        # several of the ids is not repeated and needs no DISTINCT
         if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            q &= Exists(Recipe.tags.through.objects.filter(
+                recipe_id=OuterRef("pk"),
+                tag_id__in=_params_to_ints(tags),
+            ))
         if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
-        return queryset.order_by("-id").distinct()
+            q &= Exists(Recipe.ingredients.through.objects.filter(
+                recipe_id=OuterRef("pk"),
+                ingredient_id__in=_params_to_ints(ingredients),
+            ))
+        queryset = self.queryset.filter(q)
+        if self.action == "upload_image":
+            # only the image is read and saved back
+            return queryset.only("id", "image")
+        if self.action == "list":
+            queryset = queryset.only(
+                "id", "title", "time_minutes", "price", "link"
+            )
+        # the nested serializers only read id and name
+        return queryset.prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.only("id", "name")),
+            Prefetch(
+                "ingredients",
+                queryset=Ingredient.objects.only("id", "name")
+            ),
+        ).order_by("-id")
 
     def get_serializer_class(self):
         if self.action == "list":
-            return serializers.RecipeSerializer
+            return serializers.RecipeListSerializer
         elif self.action == "upload_image":  # custom action named by func name
             return serializers.RecipeImageSerializer
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        timeout = settings.RECIPE_LIST_CACHE_TIMEOUT
+        if not timeout:
+            return super().list(request, *args, **kwargs)
+
+        cache_key = _recipe_list_cache_key(
+            request.user,
+            request.query_params.get("tags"),
+            request.query_params.get("ingredients"),
+        )
+        data = cache.get(cache_key)
+        if data is None:
+            data = list(super().list(request, *args, **kwargs).data)
+            cache.set(cache_key, data, timeout)
+        return Response(data)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        invalidate_recipe_list_cache(self.request.user)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_recipe_list_cache(self.request.user)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_recipe_list_cache(self.request.user)
 
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):